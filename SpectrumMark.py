@@ -1,11 +1,22 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import array
+import functools
 import os
+import queue
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
 import fitz  # PyMuPDF
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 
+# 日志级别：0 = 仅输出错误与汇总信息，1 = 额外输出逐页信息，2 = 额外输出逐段、逐条书签等调试信息
+LOG_LEVEL = 1
+
 # --------------------- 辅助函数 ---------------------
 def is_chinese(char):
     """
@@ -14,77 +25,234 @@ def is_chinese(char):
     return "\u0800" <= char <= "\uFFFF"
 
 
+# 连续中文字符段或连续非中文字符段（与 is_chinese 的区间一致），由 re 在 C 层完成逐字符分类
+_SEGMENT_PATTERN = re.compile("[\u0800-\uFFFF]+|[^\u0800-\uFFFF]+")
+# 整行均为中文字符（与 is_chinese 的区间一致）
+_CHINESE_LINE_PATTERN = re.compile("[\u0800-\uFFFF]+")
+# 任一非中文字符
+_NON_CHINESE_PATTERN = re.compile("[^\u0800-\uFFFF]")
+
+
 def segment_text(text_line):
     """
     将文本行分割为连续同类型字符段（中文或非中文）列表
     返回形式：[(segment, is_chinese), ...]
     """
+    # 纯 ASCII 行（最常见的情况）只有一个非中文段，无需逐字符分类
+    if text_line.isascii():
+        return [(text_line, False)] if text_line else []
+    return [(seg, is_chinese(seg[0])) for seg in _SEGMENT_PATTERN.findall(text_line)]
+
+
+class CharWidthCache(dict):
+    """
+    单字符宽度缓存（字号在一次运行中固定）：
+    首次查询某字符时调用 font.text_length 测量，并加上 char_adjust 后缓存，之后均为字典查找
+    """
+    def __init__(self, font, font_size, char_adjust=0.0):
+        super().__init__()
+        self.font = font
+        self.font_size = font_size
+        self.char_adjust = char_adjust
+
+    def __missing__(self, char):
+        width = self.font.text_length(char, fontsize=self.font_size) + self.char_adjust
+        self[char] = width
+        return width
+
+
+@functools.lru_cache(maxsize=8)
+def _get_font(name):
+    """
+    按字体名缓存 fitz.Font 对象，避免每次执行都重新加载解析字体
+    """
+    return fitz.Font(name)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_char_widths(font_name, font_size, char_adjust=0.0):
+    """
+    按（字体名，字号，字间距调整）缓存字宽表，重复执行时可直接复用已测量的字宽
+    """
+    return CharWidthCache(_get_font(font_name), font_size, char_adjust)
+
+
+def line_prefix_widths(text_line, ch_w, lat_w):
+    """
+    计算整行文本的累计宽度前缀和数组 P（array('d')，连续存放 C double），长度为 len(text_line) + 1
+    P[i] 为 text_line[:i] 的宽度，整行宽度即 P[-1]，任意区间宽度为两项之差
+    ch_w / lat_w 分别为中文、英文字宽缓存（英文字宽已含字间距调整）
+    此为未编译 Cython 模块时的实现，逐字符的区间判断直接内联（同 is_chinese），省去函数调用开销
+    """
+    # 纯 ASCII 或纯中文行只用一张字宽表，整行查表与累加均在 C 层完成
+    if text_line.isascii():
+        return array.array("d", accumulate(map(lat_w.__getitem__, text_line), initial=0.0))
+    if _CHINESE_LINE_PATTERN.fullmatch(text_line):
+        return array.array("d", accumulate(map(ch_w.__getitem__, text_line), initial=0.0))
+    return array.array("d", accumulate(
+        (ch_w[ch] if "\u0800" <= ch <= "\uFFFF" else lat_w[ch] for ch in text_line),
+        initial=0.0
+    ))
+
+
+def split_text_line(text_line, allowed_width, prefix):
+    """
+    将文本拆分成两部分，使得第一部分文字宽度不超过 allowed_width
+    prefix 为 line_prefix_widths 返回的累计宽度，拆分位置通过二分查找确定：
+    在两行均不超过 allowed_width 的拆分点中，取两行剩余空白平方和最小者（即两行宽度最均衡）；
+    若无论如何都放不进两行，则退回为第一行尽量排满
+    返回 (first_part, second_part, first_width, second_width)
+    """
+    total_width = prefix[-1]
+    greedy_index = max(1, bisect_right(prefix, allowed_width) - 1)
+    lowest_index = max(1, bisect_left(prefix, total_width - allowed_width))
+    if lowest_index <= greedy_index:
+        # 空白平方和 (A - P[k])^2 + (A - (T - P[k]))^2 在 P[k] = T / 2 处最小，只需比较其两侧的可行拆分点
+        k = bisect_left(prefix, total_width / 2, lowest_index, greedy_index + 1)
+        split_index = min(
+            (c for c in (k - 1, k) if lowest_index <= c <= greedy_index),
+            key=lambda c: (allowed_width - prefix[c]) ** 2 + (allowed_width - (total_width - prefix[c])) ** 2
+        )
+    else:
+        split_index = greedy_index
+    first_part = text_line[:split_index]
+    second_part = text_line[split_index:]
+    first_width = prefix[split_index]
+    second_width = prefix[-1] - first_width
+    return first_part, second_part, first_width, second_width
+
+
+def segments_with_widths(text_line, prefix, offset=0):
+    """
+    将文本行分段并附带各段宽度
+    返回形式：[(segment, is_chinese, width), ...]
+    prefix 为原始整行的累计宽度，offset 为 text_line 在原始行中的起始下标，段宽直接由前缀和相减得到
+    """
     segments = []
-    if text_line:
-        current_seg = text_line[0]
-        current_is_ch = is_chinese(text_line[0])
-        for ch in text_line[1:]:
-            if is_chinese(ch) == current_is_ch:
-                current_seg += ch
-            else:
-                segments.append((current_seg, current_is_ch))
-                current_seg = ch
-                current_is_ch = is_chinese(ch)
-        segments.append((current_seg, current_is_ch))
+    start = offset
+    for seg, seg_is_ch in segment_text(text_line):
+        end = start + len(seg)
+        segments.append((seg, seg_is_ch, prefix[end] - prefix[start]))
+        start = end
     return segments
 
 
-def compute_line_width(text_line, chinese_font, latin_font, font_size, char_adjust=-0.5):
+# 若已编译 Cython 加速模块，则以其替换上面的纯 Python 实现
+try:
+    from _spectrum_fast import segment_text, line_prefix_widths
+except ImportError:
+    pass
+
+
+def insert_spaced_text(shape, point, text, char_spacing, **kwargs):
+    """
+    以固定字间距插入整段文本（对应 PDF 的 Tc 运算符）
+    PyMuPDF 的 insert_text 不支持字间距参数，此处在 Shape 文本缓冲中以 q/Q 包裹设置 Tc，
+    从而整段文字只需一次 insert_text，而无需逐字符插入
+    """
+    shape.text_cont += f"\nq\n{char_spacing:g} Tc"
+    shape.insert_text(point, text, **kwargs)
+    shape.text_cont += "\nQ\n"
+
+
+# 英文字体（Times-Roman）按单字节简单编码写入，只有此区间内字符在 PDF 中的步进宽度与 fitz.Font 测得的字宽一致；
+# 其余字符（制表符、希腊/西里尔字母、表情等）逐个单独匹配
+_LATIN_RUN_PATTERN = re.compile("([\x20-\x7e\xa0-\xff]+)|.", re.S)
+
+
+def insert_latin_text(shape, point, text, char_widths, char_spacing, **kwargs):
     """
-    计算整行文本的宽度，区分中文和英文部分
+    插入一段英文（非中文）文本：
+    可按简单编码写入的连续字符整段以 Tc 字间距插入；其余字符在 PDF 中会按编码后的替代字宽步进，
+    与测量字宽不符，因此逐字符按测量宽度定位插入（与逐字插入时的位置一致）
+    char_widths 为已含字间距调整的英文字宽缓存
     """
-    total_width = 0.0
-    segments = segment_text(text_line)
-    for seg, seg_is_ch in segments:
-        if seg_is_ch:
-            seg_width = chinese_font.text_length(seg, fontsize=font_size)
-            total_width += seg_width
+    x, y = point
+    for match in _LATIN_RUN_PATTERN.finditer(text):
+        run = match.group()
+        if match.group(1):
+            insert_spaced_text(shape, (x, y), run, char_spacing, **kwargs)
         else:
-            for letter in seg:
-                letter_width = latin_font.text_length(letter, fontsize=font_size)
-                total_width += (letter_width + char_adjust)
-    return total_width
+            shape.insert_text((x, y), run, **kwargs)
+        x += sum(map(char_widths.__getitem__, run))
 
 
-def split_text_line(text_line, allowed_width, chinese_font, latin_font, font_size, char_adjust=-0.5):
+def _xref_number(ref):
     """
-    将文本拆分成两部分，使得第一部分文字宽度不超过 allowed_width
-    返回 (first_part, second_part)
+    将 "12 0 R" 形式的间接引用转换为 xref 编号
+    """
+    return int(ref.split()[0])
+
+
+def attach_page_fonts(page, fontnames, font_xrefs):
+    """
+    使页面复用文档中已注册的字体对象：
+    font_xrefs 为整个文档共享的 {字体名: xref}。字体首次使用时通过 page.insert_font 注册并记录 xref；
+    之后的页面直接在自己的 /Resources/Font 中写入对该 xref 的引用，不再逐页执行字体注册
+    （中文字体的注册开销远大于插入文字本身）。页面没有自有 /Resources（继承自页面树）时退回为 page.insert_font
     """
-    cum_width = 0.0
-    split_index = 0
-    for i, ch in enumerate(text_line):
-        if is_chinese(ch):
-            ch_width = chinese_font.text_length(ch, fontsize=font_size)
+    doc = page.parent
+    for fontname in fontnames:
+        xref = font_xrefs.get(fontname)
+        if xref is None:
+            font_xrefs[fontname] = page.insert_font(fontname=fontname)
+            continue
+
+        # xref_set_key 的键路径不能穿过间接对象，需先逐级解析 /Resources 与 /Font
+        res_type, res_value = doc.xref_get_key(page.xref, "Resources")
+        if res_type == "xref":
+            target, key = _xref_number(res_value), "Font"
+        elif res_type == "dict":
+            target, key = page.xref, "Resources/Font"
         else:
-            ch_width = latin_font.text_length(ch, fontsize=font_size) + char_adjust
-        if cum_width + ch_width <= allowed_width:
-            cum_width += ch_width
-            split_index = i + 1
+            page.insert_font(fontname=fontname)
+            continue
+        font_type, font_value = doc.xref_get_key(target, key)
+        if font_type == "xref":
+            target, key = _xref_number(font_value), fontname
         else:
-            break
-    if split_index == 0:
-        split_index = 1
-    first_part = text_line[:split_index]
-    second_part = text_line[split_index:]
-    return first_part, second_part
+            key = f"{key}/{fontname}"
 
+        # 页面已有同名字体资源时保持不变，插入文字时会按名称找到它
+        if doc.xref_get_key(target, key)[0] == "null":
+            doc.xref_set_key(target, key, f"{xref} 0 R")
 
-# --------------------- PDF 文本插入核心函数 ---------------------
-def perform_insertion(input_pdf, overlay_txt, output_pdf, insert_x, insert_y,
-                      font_size, color_str, text_align, log_func):
+
+def iter_text_lines(text_file, read_errors):
     """
-    执行 PDF 文本插入操作：
-      - input_pdf：输入 PDF 文件路径
-      - overlay_txt：待插入文本文件路径（每行对应一页）
-      - output_pdf：输出 PDF 文件路径
-      - insert_x, insert_y, font_size, color_str, text_align 为各项参数（均为字符串，由 GUI 中获取）
-      - log_func：日志打印回调，可用于在 GUI 界面输出日志信息
+    逐行读取文本文件，去除首尾空白并跳过空行
+    读取或解码出错时停止迭代，并将异常追加到 read_errors，由调用方在循环结束后处理
+    """
+    try:
+        for raw in text_file:
+            line = raw.strip()
+            if line:
+                yield line
+    except (OSError, UnicodeDecodeError) as e:
+        read_errors.append(e)
+
+
+# --------------------- 参数解析 ---------------------
+# 对齐方式编号，与 ALIGN_NAMES 中的下标一一对应
+ALIGN_LEFT, ALIGN_CENTER, ALIGN_RIGHT = 0, 1, 2
+ALIGN_NAMES = ("left", "center", "right")
+
+
+@dataclass(slots=True)
+class InsertCfg:
+    """
+    经校验后的插入参数，在一次执行开始时构造一次
+    """
+    insert_x: float
+    insert_y: float
+    font_size: float
+    color: tuple
+    align: int  # ALIGN_LEFT / ALIGN_CENTER / ALIGN_RIGHT
+
+
+def parse_insertion_config(insert_x, insert_y, font_size, color_str, text_align, log_func):
+    """
+    解析并校验 GUI 传入的字符串参数，返回 InsertCfg；坐标或字号无效时返回 None
     """
     try:
         insert_x = float(insert_x)
@@ -92,10 +260,10 @@ def perform_insertion(input_pdf, overlay_txt, output_pdf, insert_x, insert_y,
         font_size = float(font_size)
     except ValueError:
         log_func("错误：插入 X/Y 坐标和字体大小必须为数字格式！")
-        return
+        return None
 
     text_align = text_align.lower().strip()
-    if text_align not in ("left", "center", "right"):
+    if text_align not in ALIGN_NAMES:
         log_func("警告：文字对齐方式无效，采用默认 left 对齐")
         text_align = "left"
 
@@ -105,22 +273,48 @@ def perform_insertion(input_pdf, overlay_txt, output_pdf, insert_x, insert_y,
         if len(color_values) != 3:
             raise ValueError
         if any(c > 1 for c in color_values):
-            color_black = tuple(c / 255.0 for c in color_values)
+            color = tuple(c / 255.0 for c in color_values)
         else:
-            color_black = tuple(color_values)
+            color = tuple(color_values)
     except Exception:
         log_func("配置中颜色参数有误，采用默认黑色 (0,0,0)")
-        color_black = (0, 0, 0)
+        color = (0, 0, 0)
 
-    if not os.path.exists(overlay_txt):
-        log_func("未找到文本文件: " + overlay_txt)
+    return InsertCfg(insert_x, insert_y, font_size, color, ALIGN_NAMES.index(text_align))
+
+
+def aligned_x(cfg, page_width, line_width):
+    """
+    按对齐方式计算一行文本的起始 X 坐标（以对齐编号查表，无需逐页比较字符串）
+    """
+    return (
+        cfg.insert_x,
+        (page_width - line_width) / 2,
+        page_width - cfg.insert_x - line_width
+    )[cfg.align]
+
+
+# --------------------- PDF 文本插入核心函数 ---------------------
+def perform_insertion(input_pdf, overlay_txt, output_pdf, insert_x, insert_y,
+                      font_size, color_str, text_align, log_func, debug=False):
+    """
+    执行 PDF 文本插入操作：
+      - input_pdf：输入 PDF 文件路径
+      - overlay_txt：待插入文本文件路径（每行对应一页）
+      - output_pdf：输出 PDF 文件路径
+      - insert_x, insert_y, font_size, color_str, text_align 为各项参数（均为字符串，由 GUI 中获取）
+      - log_func：日志打印回调，可用于在 GUI 界面输出日志信息
+      - debug：为 True 时额外输出逐段宽度等调试日志（LOG_LEVEL >= 2 时始终输出）
+    """
+    # 日志按级别提前判断，被屏蔽的日志不会格式化 f-string
+    verbose = LOG_LEVEL >= 1
+    debug = debug or LOG_LEVEL >= 2
+    cfg = parse_insertion_config(insert_x, insert_y, font_size, color_str, text_align, log_func)
+    if cfg is None:
         return
 
-    try:
-        with open(overlay_txt, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if line.strip()]
-    except Exception as e:
-        log_func("读取文本文件失败: " + str(e))
+    if not os.path.exists(overlay_txt):
+        log_func("未找到文本文件: " + overlay_txt)
         return
 
     try:
@@ -132,153 +326,166 @@ def perform_insertion(input_pdf, overlay_txt, output_pdf, insert_x, insert_y,
     # 定义字体（中文用内置 "china-s"，英文用 "Times-Roman"）
     chinese_font_name = "china-s"
     latin_font_name = "Times-Roman"
+    char_adjust = -0.5
+    # 字号在整个运行过程中固定，按字符缓存字宽，避免重复调用 text_length
     try:
-        chinese_font_obj = fitz.Font(chinese_font_name)
+        ch_w = _get_char_widths(chinese_font_name, cfg.font_size)
     except Exception as e:
         log_func(f"加载中文字体 '{chinese_font_name}' 失败: " + str(e))
         return
-    latin_font_obj = fitz.Font(latin_font_name)
-    char_adjust = -0.5
+    lat_w = _get_char_widths(latin_font_name, cfg.font_size, char_adjust)
 
-    num_lines = len(lines)
-    num_pages = doc.page_count
-    count = min(num_lines, num_pages)
     toc = []  # 用于存储书签数据
 
-    for i in range(count):
-        text_line = lines[i]
-        page = doc[i]
-        page_height = page.rect.height
-        page_width = page.rect.width
-        adjusted_y = page_height - insert_y
-
-        # 计算文本宽度与允许的最大区域
-        line_width = compute_line_width(text_line, chinese_font_obj, latin_font_obj, font_size, char_adjust)
-        allowed_width = page_width - 2 * insert_x
-
-        log_func(f"在第 {i+1} 页插入文本: {text_line}")
-        log_func(f"预计算整行宽度: {line_width}，允许最大宽度: {allowed_width}，对齐方式: {text_align}")
-
-        # 如果文本超过允许宽度，则拆分成两行
-        if line_width > allowed_width:
-            first_part, second_part = split_text_line(text_line, allowed_width, chinese_font_obj, latin_font_obj, font_size, char_adjust)
-            first_line_width = compute_line_width(first_part, chinese_font_obj, latin_font_obj, font_size, char_adjust)
-            second_line_width = compute_line_width(second_part, chinese_font_obj, latin_font_obj, font_size, char_adjust)
-
-            if text_align == "left":
-                x1 = insert_x
-                x2 = insert_x
-            elif text_align == "center":
-                x1 = (page_width - first_line_width) / 2
-                x2 = (page_width - second_line_width) / 2
-            elif text_align == "right":
-                x1 = page_width - insert_x - first_line_width
-                x2 = page_width - insert_x - second_line_width
-
-            first_line_y = adjusted_y - font_size - 2
-            second_line_y = adjusted_y
-
-            log_func(f"文本过长，拆为两行插入：\n  第一行: '{first_part}'，起始坐标: ({x1}, {first_line_y})\n  第二行: '{second_part}'，起始坐标: ({x2}, {second_line_y})")
-
-            # 插入第一行
-            segments_first = segment_text(first_part)
-            current_x = x1
-            for seg, seg_is_ch in segments_first:
-                if seg_is_ch:
-                    page.insert_text(
-                        (current_x, first_line_y),
-                        seg,
-                        fontname=chinese_font_name,
-                        fontsize=font_size,
-                        color=color_black,
-                        overlay=True
-                    )
-                    seg_width = chinese_font_obj.text_length(seg, fontsize=font_size)
-                    current_x += seg_width
-                else:
-                    for letter in seg:
-                        page.insert_text(
+    try:
+        txt_file = open(overlay_txt, "r", encoding="utf-8")
+    except OSError as e:
+        log_func("读取文本文件失败: " + str(e))
+        doc.close()
+        return
+
+    font_xrefs = {}  # 全文档共享的 {字体名: xref}
+    read_errors = []
+    with txt_file:
+        # 逐行读取文本并与页面一一对应，无需先将整个文件读入内存；多余的行或页面均忽略
+        lines_iter = iter_text_lines(txt_file, read_errors)
+        page_rect = None
+        for i, (text_line, page) in enumerate(zip(lines_iter, doc)):
+            # 每页只读取一次 page.rect；页面尺寸与上一页相同时（最常见）直接沿用已计算的几何参数
+            rect = page.rect
+            if rect != page_rect:
+                page_rect = rect
+                page_width = rect.width
+                adjusted_y = rect.height - cfg.insert_y
+                allowed_width = page_width - 2 * cfg.insert_x
+            # 本页只挂接实际用到的字体，全文档共用同一字体对象
+            fontnames = []
+            if _CHINESE_LINE_PATTERN.search(text_line):
+                fontnames.append(chinese_font_name)
+            if _NON_CHINESE_PATTERN.search(text_line):
+                fontnames.append(latin_font_name)
+            attach_page_fonts(page, fontnames, font_xrefs)
+            # 本页所有文字先写入同一个 Shape，最后一次性提交到页面内容流
+            shape = page.new_shape()
+
+            # 计算文本宽度与允许的最大区域
+            prefix = line_prefix_widths(text_line, ch_w, lat_w)
+            line_width = prefix[-1]
+
+            if verbose:
+                log_func(f"在第 {i+1} 页插入文本: {text_line}")
+                log_func(f"预计算整行宽度: {line_width}，允许最大宽度: {allowed_width}，对齐方式: {ALIGN_NAMES[cfg.align]}")
+
+            # 如果文本超过允许宽度，则拆分成两行
+            if line_width > allowed_width:
+                first_part, second_part, first_line_width, second_line_width = split_text_line(
+                    text_line, allowed_width, prefix)
+
+                x1 = aligned_x(cfg, page_width, first_line_width)
+                x2 = aligned_x(cfg, page_width, second_line_width)
+
+                first_line_y = adjusted_y - cfg.font_size - 2
+                second_line_y = adjusted_y
+
+                if verbose:
+                    log_func(f"文本过长，拆为两行插入：\n  第一行: '{first_part}'，起始坐标: ({x1}, {first_line_y})\n  第二行: '{second_part}'，起始坐标: ({x2}, {second_line_y})")
+
+                # 插入第一行
+                segments_first = segments_with_widths(first_part, prefix)
+                current_x = x1
+                for seg, seg_is_ch, seg_width in segments_first:
+                    if seg_is_ch:
+                        shape.insert_text(
                             (current_x, first_line_y),
-                            letter,
+                            seg,
+                            fontname=chinese_font_name,
+                            fontsize=cfg.font_size,
+                            color=cfg.color
+                        )
+                    else:
+                        insert_latin_text(
+                            shape,
+                            (current_x, first_line_y),
+                            seg,
+                            lat_w,
+                            char_adjust,
                             fontname=latin_font_name,
-                            fontsize=font_size,
-                            color=color_black,
-                            overlay=True
+                            fontsize=cfg.font_size,
+                            color=cfg.color
                         )
-                        letter_width = latin_font_obj.text_length(letter, fontsize=font_size)
-                        current_x += (letter_width + char_adjust)
-
-            # 插入第二行
-            segments_second = segment_text(second_part)
-            current_x = x2
-            for seg, seg_is_ch in segments_second:
-                if seg_is_ch:
-                    page.insert_text(
-                        (current_x, second_line_y),
-                        seg,
-                        fontname=chinese_font_name,
-                        fontsize=font_size,
-                        color=color_black,
-                        overlay=True
-                    )
-                    seg_width = chinese_font_obj.text_length(seg, fontsize=font_size)
+                    # 段宽取自前缀和，英文段已含每字符的 char_adjust（即 Tc），每段只需一次加法
                     current_x += seg_width
-                else:
-                    for letter in seg:
-                        page.insert_text(
+
+                # 插入第二行
+                segments_second = segments_with_widths(second_part, prefix, len(first_part))
+                current_x = x2
+                for seg, seg_is_ch, seg_width in segments_second:
+                    if seg_is_ch:
+                        shape.insert_text(
+                            (current_x, second_line_y),
+                            seg,
+                            fontname=chinese_font_name,
+                            fontsize=cfg.font_size,
+                            color=cfg.color
+                        )
+                    else:
+                        insert_latin_text(
+                            shape,
                             (current_x, second_line_y),
-                            letter,
+                            seg,
+                            lat_w,
+                            char_adjust,
                             fontname=latin_font_name,
-                            fontsize=font_size,
-                            color=color_black,
-                            overlay=True
+                            fontsize=cfg.font_size,
+                            color=cfg.color
                         )
-                        letter_width = latin_font_obj.text_length(letter, fontsize=font_size)
-                        current_x += (letter_width + char_adjust)
-        else:
-            # 单行插入
-            if text_align == "left":
-                current_x = insert_x
-            elif text_align == "center":
-                current_x = (page_width - line_width) / 2
-            elif text_align == "right":
-                current_x = page_width - insert_x - line_width
-
-            log_func("单行插入，起始 X 坐标: " + str(current_x))
-            segments = segment_text(text_line)
-            for seg, seg_is_ch in segments:
-                if seg_is_ch:
-                    page.insert_text(
-                        (current_x, adjusted_y),
-                        seg,
-                        fontname=chinese_font_name,
-                        fontsize=font_size,
-                        color=color_black,
-                        overlay=True
-                    )
-                    seg_width = chinese_font_obj.text_length(seg, fontsize=font_size)
-                    log_func(f"中文段: '{seg}' 宽度: {seg_width}")
                     current_x += seg_width
-                else:
-                    for letter in seg:
-                        page.insert_text(
+            else:
+                # 单行插入
+                current_x = aligned_x(cfg, page_width, line_width)
+
+                if verbose:
+                    log_func("单行插入，起始 X 坐标: " + str(current_x))
+                segments = segments_with_widths(text_line, prefix)
+                for seg, seg_is_ch, seg_width in segments:
+                    if seg_is_ch:
+                        shape.insert_text(
                             (current_x, adjusted_y),
-                            letter,
+                            seg,
+                            fontname=chinese_font_name,
+                            fontsize=cfg.font_size,
+                            color=cfg.color
+                        )
+                        if debug:
+                            log_func(f"中文段: '{seg}' 宽度: {seg_width}")
+                    else:
+                        insert_latin_text(
+                            shape,
+                            (current_x, adjusted_y),
+                            seg,
+                            lat_w,
+                            char_adjust,
                             fontname=latin_font_name,
-                            fontsize=font_size,
-                            color=color_black,
-                            overlay=True
+                            fontsize=cfg.font_size,
+                            color=cfg.color
                         )
-                        letter_width = latin_font_obj.text_length(letter, fontsize=font_size)
-                        log_func(f"英文字符: '{letter}' 宽度: {letter_width}")
-                        current_x += (letter_width + char_adjust)
-        toc.append([1, text_line, i + 1])
+                        if debug:
+                            log_func(f"英文段: '{seg}' 总宽: {seg_width}")
+                    current_x += seg_width
+            shape.commit(overlay=True)
+            toc.append((1, text_line, i + 1))
+    if read_errors:
+        log_func("读取文本文件失败: " + str(read_errors[0]))
+        doc.close()
+        return
 
 # 添加书签信息（页面编号从 1 开始）
     doc.set_toc(toc)
-    for level, title, page in toc:
-        log_func(f"生成书签: 层级={level}, 标题='{title}', 页面={page}")
-    
+    if debug:
+        for level, title, page in toc:
+            log_func(f"生成书签: 层级={level}, 标题='{title}', 页面={page}")
+    log_func(f"生成 {len(toc)} 条书签")
+
     try:
         doc.save(output_pdf)
         log_func("文本成功插入对应页，输出文件为：" + output_pdf)
@@ -288,12 +495,20 @@ def perform_insertion(input_pdf, overlay_txt, output_pdf, insert_x, insert_y,
 
 
 # --------------------- GUI 界面 ---------------------
+# 日志队列中表示后台任务结束的标记
+_TASK_DONE = object()
+
+
 class PDFInsertionApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("PDF 文本插入工具        by unruffle")
         self.geometry("600x550")
+        # 后台线程通过队列传递日志，由主线程定时取出写入日志框
+        self.log_queue = queue.Queue()
+        self._task_error = None
         self.create_widgets()
+        self.after(50, self._drain_log_queue)
 
     def create_widgets(self):
         # 框架：参数设置区域
@@ -344,7 +559,8 @@ class PDFInsertionApp(tk.Tk):
         tk.OptionMenu(frame, self.text_align_var, "left", "center", "right").grid(row=7, column=1, sticky="w", padx=5)
 
         # “开始执行”按钮
-        tk.Button(self, text="开始执行", command=self.start_process, width=20).pack(pady=10)
+        self.start_button = tk.Button(self, text="开始执行", command=self.start_process, width=20)
+        self.start_button.pack(pady=10)
 
         # 日志输出文本框
         tk.Label(self, text="日志信息：").pack(anchor="w", padx=10)
@@ -367,8 +583,26 @@ class PDFInsertionApp(tk.Tk):
             self.output_pdf_var.set(filename)
 
     def log(self, message):
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
+        # 可在后台线程中调用，实际写入日志框由 _drain_log_queue 在主线程完成
+        self.log_queue.put(message)
+
+    def _drain_log_queue(self):
+        inserted = False
+        while True:
+            try:
+                message = self.log_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message is _TASK_DONE:
+                self.start_button.config(state="normal")
+                if self._task_error is not None:
+                    messagebox.showerror("错误", self._task_error)
+                continue
+            self.log_text.insert(tk.END, message + "\n")
+            inserted = True
+        if inserted:
+            self.log_text.see(tk.END)
+        self.after(50, self._drain_log_queue)
 
     def start_process(self):
         # 清空日志
@@ -389,14 +623,24 @@ class PDFInsertionApp(tk.Tk):
         text_align = self.text_align_var.get().strip()
 
         self.log("开始处理……")
+        # 在后台线程中执行插入，避免阻塞界面；执行期间禁用按钮防止重复启动
+        self.start_button.config(state="disabled")
+        self._task_error = None
+        threading.Thread(
+            target=self._run_insertion,
+            args=(input_pdf, overlay_txt, output_pdf,
+                  insert_x, insert_y, font_size, color_black, text_align),
+            daemon=True
+        ).start()
+
+    def _run_insertion(self, *args):
         try:
-            perform_insertion(input_pdf, overlay_txt, output_pdf,
-                              insert_x, insert_y, font_size, color_black, text_align,
-                              self.log)
+            perform_insertion(*args, self.log)
             self.log("处理完成！")
         except Exception as e:
             self.log("出现异常：" + str(e))
-            messagebox.showerror("错误", str(e))
+            self._task_error = str(e)
+        self.log_queue.put(_TASK_DONE)
 
 
 if __name__ == "__main__":
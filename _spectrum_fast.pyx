@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+SpectrumMark 逐字符热点函数的 Cython 实现（可选加速模块）
+编译：cythonize -i _spectrum_fast.pyx
+未编译时 SpectrumMark.py 自动使用同名的纯 Python 实现，两者结果一致
+"""
+
+from cpython cimport array
+import array
+
+cdef array.array _DOUBLE_TEMPLATE = array.array("d")
+
+
+cpdef list segment_text(unicode text_line):
+    """
+    将文本行分割为连续同类型字符段（中文或非中文）列表
+    返回形式：[(segment, is_chinese), ...]
+    """
+    cdef list segments = []
+    cdef Py_ssize_t i = 0, start = 0
+    cdef Py_UCS4 ch
+    cdef bint current_is_ch = False, new_is_ch
+    # 纯 ASCII 行只有一个非中文段，无需逐字符分类
+    if text_line.isascii():
+        return [(text_line, False)] if text_line else []
+    for ch in text_line:
+        new_is_ch = 0x0800 <= ch <= 0xFFFF
+        if i == 0:
+            current_is_ch = new_is_ch
+        elif new_is_ch != current_is_ch:
+            segments.append((text_line[start:i], current_is_ch))
+            start = i
+            current_is_ch = new_is_ch
+        i += 1
+    if i:
+        segments.append((text_line[start:], current_is_ch))
+    return segments
+
+
+cpdef array.array line_prefix_widths(unicode text_line, ch_w, lat_w):
+    """
+    计算整行文本的累计宽度前缀和数组 P（array('d')），长度为 len(text_line) + 1
+    ch_w / lat_w 为字宽缓存（按下标取值，以便触发 CharWidthCache 的未命中测量）
+    """
+    cdef array.array prefix = array.clone(_DOUBLE_TEMPLATE, len(text_line) + 1, zero=False)
+    cdef double[::1] P = prefix
+    cdef double total = 0.0
+    cdef Py_ssize_t i = 0
+    cdef Py_UCS4 ch
+    cdef object key
+    P[0] = 0.0
+    for ch in text_line:
+        key = ch  # 以单字符字符串作为缓存键
+        if 0x0800 <= ch <= 0xFFFF:
+            total += <double>ch_w[key]
+        else:
+            total += <double>lat_w[key]
+        i += 1
+        P[i] = total
+    return prefix